@@ -37,24 +37,71 @@ engagement and narrative learning rather than rote recall
 from __future__ import annotations
 
 import datetime
-import random
+import hashlib
 import string
-from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import List, NamedTuple, Tuple
 
 import numpy as np
-import pandas as pd
 import streamlit as st
 
 
-@dataclass
-class MonthlyData:
-    """Container for a single month's synthetic data.
+MONTH_NAMES: Tuple[str, ...] = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+NUM_MONTHS = len(MONTH_NAMES)
+DAYS_IN_MONTH = 30  # fixed for simplicity
+PUMP_NAMES: Tuple[str, ...] = ("Omnipod", "Tandem t:slim X2", "Medtronic 780G")
+FIRST_NAMES: Tuple[str, ...] = (
+    "Alex", "Casey", "Jordan", "Taylor", "Morgan",
+    "Robin", "Blake", "Sydney", "Jamie", "Avery",
+)
+LAST_NAMES: Tuple[str, ...] = (
+    "Nguyen", "Smith", "Patel", "Kim", "Garcia",
+    "Brown", "Hernandez", "Lee", "Johnson", "Davis",
+)
+# Monthly narrative templates, indexed by the codes from _classify_months
+NOTE_ROUTINE, NOTE_DAWN, NOTE_EXERCISE, NOTE_SICK_DAY = range(4)
+NOTE_TEMPLATES: Tuple[str, ...] = (
+    "Routine month of pump therapy in {month}. Continued monitoring.",
+    "Observed higher fasting glucose in {month}. "
+    "Increased early‑morning basal to address the dawn phenomenon【23†L633-L641】.",
+    "Regular aerobic exercise in {month} lowered glucose levels. "
+    "Temporary basal reduction of 50% during workouts was applied【37†L9-L17】.",
+    "Illness in {month} increased insulin requirements. "
+    "Temporary basal increased by 30% as per sick‑day protocol【38†L19-L25】.",
+)
+# Every template rendered for every month, indexed as NOTES_TABLE[code][month]
+NOTES_TABLE: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(template.format(month=month) for month in MONTH_NAMES)
+    for template in NOTE_TEMPLATES
+)
+# Target range for monthly mean BG (mg/dL) and the recommendation given
+# below, within and above it
+BG_TARGET_RANGE: Tuple[float, float] = (80.0, 180.0)
+RECOMMENDATIONS: Tuple[str, str, str] = (
+    "Average blood glucose is below target. Reduce basal delivery or increase "
+    "carbohydrate intake at snacks. Consider setting a temporary basal decrease "
+    "during times of increased activity.",
+    "Average blood glucose is within target range. Continue current pump settings "
+    "while maintaining regular monitoring.",
+    "Average blood glucose is above target. Consider increasing basal "
+    "rates in the early morning or adjusting the insulin‑to‑carbohydrate ratio "
+    "for meals. Review bolus timing to ensure pre‑meal dosing.",
+)
+
+
+class MonthlyData(NamedTuple):
+    """Lightweight view of a single month's synthetic data.
 
     Attributes
     ----------
-    bg_values: List[float]
-        Daily blood glucose readings for the month (mg/dL).
+    bg_values: np.ndarray
+        Daily blood glucose readings for the month (mg/dL), a
+        ``float32`` view into the cohort's BG block.
+    avg_bg: float
+        Mean of ``bg_values``.
     basal_units: float
         Total basal insulin delivered per day (units/day) –
         representing the mean basal requirement for the month.
@@ -65,54 +112,172 @@ class MonthlyData:
         experiences in the month.
     """
 
-    bg_values: List[float]
+    bg_values: np.ndarray
+    avg_bg: float
     basal_units: float
     bolus_units: float
     notes: str
 
 
 @dataclass
-class Patient:
-    """Data structure representing a synthetic insulin pump user."""
+class Cohort:
+    """Synthetic insulin pump users stored as contiguous arrays.
 
-    id: int
-    name: str
-    pump_type: str
-    months: Dict[int, MonthlyData] = field(default_factory=dict)
+    Patient‑months are laid out structure‑of‑arrays style: the first
+    axis of every array indexes the patient and the second the month,
+    so cohort‑wide aggregates are single vectorised reductions.
 
-    def average_bg(self, month_index: int) -> float:
-        """Return the average blood glucose for a given month."""
-        month_data = self.months[month_index]
-        return float(np.mean(month_data.bg_values))
+    Attributes
+    ----------
+    names: List[str]
+        Human‑readable patient names.
+    pump_idx: np.ndarray
+        Pump type of each patient as an index into
+        :data:`PUMP_NAMES`, shape ``(N,)`` (int8).
+    bg: np.ndarray
+        Daily blood glucose readings, shape ``(N, 12, 30)`` (float32).
+    basal: np.ndarray
+        Basal units/day, shape ``(N, 12)`` (float32).
+    bolus: np.ndarray
+        Bolus units/day, shape ``(N, 12)`` (float32).
+    note_codes: np.ndarray
+        Monthly narrative note codes indexing :data:`NOTES_TABLE`,
+        shape ``(N, 12)`` (int8).
+    avg_bg: np.ndarray
+        Monthly mean blood glucose, shape ``(N, 12)``.
+    """
 
-    def metrics_for_month(self, month_index: int) -> Tuple[float, float, float]:
-        """Return average BG, basal units and bolus units for the month."""
-        md = self.months[month_index]
-        avg_bg = float(np.mean(md.bg_values))
-        return avg_bg, md.basal_units, md.bolus_units
+    names: List[str]
+    pump_idx: np.ndarray
+    bg: np.ndarray
+    basal: np.ndarray
+    bolus: np.ndarray
+    note_codes: np.ndarray
+    avg_bg: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def pump_type(self, patient_idx: int) -> str:
+        """Return the pump name of the given patient."""
+        return PUMP_NAMES[self.pump_idx[patient_idx]]
+
+    def month_view(self, patient_idx: int, month_index: int) -> MonthlyData:
+        """Return the data for one patient‑month without copying."""
+        return MonthlyData(
+            bg_values=self.bg[patient_idx, month_index],
+            avg_bg=float(self.avg_bg[patient_idx, month_index]),
+            basal_units=float(self.basal[patient_idx, month_index]),
+            bolus_units=float(self.bolus[patient_idx, month_index]),
+            notes=NOTES_TABLE[self.note_codes[patient_idx, month_index]][month_index],
+        )
 
 
-def _generate_name() -> str:
-    """Generate a random human‑readable name.
+def _generate_names(rng: np.random.Generator, count: int) -> List[str]:
+    """Generate ``count`` random human‑readable names.
 
     To make the synthetic patients easier to relate to, this helper
     picks a given name and family name from short lists.  In a
     classroom setting these names reinforce the human dimension
     without referencing real individuals.
     """
-    first_names = [
-        "Alex", "Casey", "Jordan", "Taylor", "Morgan",
-        "Robin", "Blake", "Sydney", "Jamie", "Avery",
-    ]
-    last_names = [
-        "Nguyen", "Smith", "Patel", "Kim", "Garcia",
-        "Brown", "Hernandez", "Lee", "Johnson", "Davis",
-    ]
-    return f"{random.choice(first_names)} {random.choice(last_names)}"
+    first_idx = rng.integers(0, len(FIRST_NAMES), size=count)
+    last_idx = rng.integers(0, len(LAST_NAMES), size=count)
+    return [f"{FIRST_NAMES[i]} {LAST_NAMES[j]}" for i, j in zip(first_idx, last_idx)]
+
+
+def _patient_rng(pid: int) -> np.random.Generator:
+    """Return a random generator seeded from the patient's identity.
+
+    Hashing the patient id into the seed gives every patient an
+    independent, reproducible stream, so a patient's data do not
+    change when the cohort grows or is generated in another order.
+    """
+    digest = hashlib.md5(f"patient-{pid}".encode()).digest()
+    return np.random.default_rng(int.from_bytes(digest[:8], "big"))
+
+
+@st.cache_data(show_spinner=False)
+def _generate_patient(
+    pid: int,
+) -> Tuple[str, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Draw one synthetic patient's name, pump and year of data.
+
+    Returns
+    -------
+    tuple
+        ``(name, pump_idx, base_means, bg, basal, bolus)`` where
+        ``pump_idx`` indexes :data:`PUMP_NAMES`, ``base_means``,
+        ``basal`` and ``bolus`` have shape ``(12,)`` and ``bg`` has
+        shape ``(12, 30)``.
+
+    Notes
+    -----
+    Cached per patient id, so changing the cohort size only generates
+    the patients that are new.
+    """
+    rng = _patient_rng(pid)
+    name = _generate_names(rng, 1)[0]
+    pump_idx = int(rng.integers(0, len(PUMP_NAMES)))
+    # Base mean BG around 140 mg/dL with variation; modify for pump type
+    base_means = 140 + rng.normal(0, 10, size=NUM_MONTHS)
+    # Slightly lower mean if using advanced hybrid pump (Tandem or Medtronic)
+    if pump_idx != 0:
+        base_means -= 5
+    # Simulate daily BG values for the whole year in one float32 draw and
+    # clip to a plausible range (50–350); single precision is ample for
+    # readings that are displayed to one decimal place
+    bg = rng.standard_normal((NUM_MONTHS, DAYS_IN_MONTH), dtype=np.float32)
+    bg *= 20
+    bg += base_means[:, None].astype(np.float32)
+    np.clip(bg, 50, 350, out=bg)
+    # Basal units/day: around 20–40 units depending on patient size; vary over months
+    basal = rng.uniform(18, 40, size=NUM_MONTHS).astype(np.float32)
+    # Bolus units/day: meal and correction doses; around 15–35 units
+    bolus = rng.uniform(15, 35, size=NUM_MONTHS).astype(np.float32)
+    return name, pump_idx, base_means, bg, basal, bolus
+
+
+def _classify_months(base_means: np.ndarray, mean_bg: np.ndarray) -> np.ndarray:
+    """Select the narrative note for every patient‑month.
+
+    Parameters
+    ----------
+    base_means: np.ndarray
+        Mean of the BG distribution each month was sampled from,
+        shape ``(N, 12)``.
+    mean_bg: np.ndarray
+        Observed monthly mean BG, shape ``(N, 12)``.
+
+    Returns
+    -------
+    np.ndarray
+        ``int8`` codes indexing :data:`NOTE_TEMPLATES`, shape ``(N, 12)``.
+
+    Notes
+    -----
+    Conditions are checked in priority order: higher fasting glucose
+    early in the year suggests the dawn phenomenon, low averages in
+    spring reflect exercise and high averages in October a sick day.
+    """
+    month = np.arange(base_means.shape[-1])
+    return np.select(
+        [
+            # Dawn phenomenon adjustments early in the year
+            (month <= 1) & (base_means > 150),
+            # Exercise adjustments in spring/summer
+            (month >= 3) & (month <= 5) & (mean_bg < 120),
+            # Sick day high in winter
+            (month == 9) & (mean_bg > 170),
+        ],
+        [NOTE_DAWN, NOTE_EXERCISE, NOTE_SICK_DAY],
+        default=NOTE_ROUTINE,
+    ).astype(np.int8)
 
 
-def create_patients(num_patients: int = 10) -> List[Patient]:
-    """Construct a list of synthetic patients with one year of data.
+@st.cache_data(show_spinner=False)
+def create_patients(num_patients: int = 10) -> Cohort:
+    """Construct a cohort of synthetic patients with one year of data.
 
     Parameters
     ----------
@@ -121,8 +286,8 @@ def create_patients(num_patients: int = 10) -> List[Patient]:
 
     Returns
     -------
-    List[Patient]
-        Generated patient objects populated with monthly data.
+    Cohort
+        Generated patients with their monthly data stored as arrays.
 
     Notes
     -----
@@ -134,75 +299,48 @@ def create_patients(num_patients: int = 10) -> List[Patient]:
     typical scenarios such as basal adjustments for dawn
     phenomenon【23†L633-L641】, exercise management【37†L9-L17】 or
     sick day increases【38†L19-L25】.
+
+    Every patient is drawn from its own generator (see
+    :func:`_patient_rng`).  The result is cached by Streamlit, so the
+    cohort is generated once and reused across reruns triggered by
+    widget interactions.
     """
-    random.seed(42)
-    np.random.seed(42)
-    patients: List[Patient] = []
-    pump_choices = ["Omnipod", "Tandem t:slim X2", "Medtronic 780G"]
-    month_names = [
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December",
-    ]
+    names: List[str] = []
+    pump_idx = np.empty(num_patients, dtype=np.int8)
+    base_means = np.empty((num_patients, NUM_MONTHS))
+    bg_all = np.empty((num_patients, NUM_MONTHS, DAYS_IN_MONTH), dtype=np.float32)
+    basal_all = np.empty((num_patients, NUM_MONTHS), dtype=np.float32)
+    bolus_all = np.empty((num_patients, NUM_MONTHS), dtype=np.float32)
     for pid in range(num_patients):
-        name = _generate_name()
-        pump = random.choice(pump_choices)
-        patient = Patient(id=pid, name=name, pump_type=pump)
-        for m_idx in range(12):
-            # Simulate daily blood glucose values for each day of month
-            days_in_month = 30  # fixed for simplicity
-            # Base mean BG around 140 mg/dL with variation; modify for pump type
-            base_mean = 140 + np.random.normal(0, 10)
-            # Slightly lower mean if using advanced hybrid pump (Tandem or Medtronic)
-            if pump != "Omnipod":
-                base_mean -= 5
-            # Simulate BG values with normal distribution and clip to plausible range (50–350)
-            bg_values = np.random.normal(loc=base_mean, scale=20, size=days_in_month)
-            bg_values = np.clip(bg_values, 50, 350).tolist()
-            # Basal units/day: around 20–40 units depending on patient size; vary over months
-            basal_units = float(np.random.uniform(18, 40))
-            # Bolus units/day: meal and correction doses; around 15–35 units
-            bolus_units = float(np.random.uniform(15, 35))
-            # Compose narrative note based on month and random events
-            note = ""
-            month_name = month_names[m_idx]
-            # Dawn phenomenon adjustments early in the year
-            if m_idx in [0, 1] and base_mean > 150:
-                note = (
-                    f"Observed higher fasting glucose in {month_name}. "
-                    "Increased early‑morning basal to address the dawn phenomenon【23†L633-L641】."
-                )
-            # Exercise adjustments in spring/summer
-            elif m_idx in [3, 4, 5] and np.mean(bg_values) < 120:
-                note = (
-                    f"Regular aerobic exercise in {month_name} lowered glucose levels. "
-                    "Temporary basal reduction of 50% during workouts was applied【37†L9-L17】."
-                )
-            # Sick day high in winter
-            elif m_idx in [9] and np.mean(bg_values) > 170:
-                note = (
-                    f"Illness in {month_name} increased insulin requirements. "
-                    "Temporary basal increased by 30% as per sick‑day protocol【38†L19-L25】."
-                )
-            else:
-                note = f"Routine month of pump therapy in {month_name}. Continued monitoring."
-            md = MonthlyData(
-                bg_values=bg_values,
-                basal_units=basal_units,
-                bolus_units=bolus_units,
-                notes=note,
-            )
-            patient.months[m_idx] = md
-        patients.append(patient)
-    return patients
-
-
-def recommend_adjustment(patient: Patient, month_index: int) -> str:
+        name, pump, means, bg, basal, bolus = _generate_patient(pid)
+        names.append(name)
+        pump_idx[pid] = pump
+        base_means[pid] = means
+        bg_all[pid] = bg
+        basal_all[pid] = basal
+        bolus_all[pid] = bolus
+    # Monthly means are reduced once and shared by the notes and the cohort
+    mean_bg_all = bg_all.mean(axis=2)
+    return Cohort(
+        names=names,
+        pump_idx=pump_idx,
+        bg=bg_all,
+        basal=basal_all,
+        bolus=bolus_all,
+        note_codes=_classify_months(base_means, mean_bg_all),
+        avg_bg=mean_bg_all,
+    )
+
+
+def recommend_adjustment(cohort: Cohort, patient_idx: int, month_index: int) -> str:
     """Provide a simple recommendation based on average blood glucose.
 
     Parameters
     ----------
-    patient: Patient
-        The patient whose data we are analysing.
+    cohort: Cohort
+        The cohort containing the patient whose data we are analysing.
+    patient_idx: int
+        Index of the patient within the cohort.
     month_index: int
         Index of the month (0–11).
 
@@ -219,35 +357,14 @@ def recommend_adjustment(patient: Patient, month_index: int) -> str:
     settings are appropriate.  These heuristics are simplistic and
     serve illustrative purposes only.
     """
-    avg_bg, basal_units, bolus_units = patient.metrics_for_month(month_index)
-    recommendation: str
-    if avg_bg > 180:
-        recommendation = (
-            "Average blood glucose is above target. Consider increasing basal "
-            "rates in the early morning or adjusting the insulin‑to‑carbohydrate ratio "
-            "for meals. Review bolus timing to ensure pre‑meal dosing."
-        )
-    elif avg_bg < 80:
-        recommendation = (
-            "Average blood glucose is below target. Reduce basal delivery or increase "
-            "carbohydrate intake at snacks. Consider setting a temporary basal decrease "
-            "during times of increased activity."
-        )
-    else:
-        recommendation = (
-            "Average blood glucose is within target range. Continue current pump settings "
-            "while maintaining regular monitoring."
-        )
-    return recommendation
+    avg_bg = float(cohort.avg_bg[patient_idx, month_index])
+    low, high = BG_TARGET_RANGE
+    return RECOMMENDATIONS[(avg_bg >= low) + (avg_bg > high)]
 
 
 def _format_month(index: int) -> str:
     """Return the human‑readable month name for the given index."""
-    month_names = [
-        "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December",
-    ]
-    return month_names[index]
+    return MONTH_NAMES[index]
 
 
 def main() -> None:
@@ -268,40 +385,48 @@ def main() -> None:
         patient data.
         """
     )
-    # Sidebar controls
-    patients = create_patients(10)
-    patient_names = [p.name for p in patients]
-    selected_name = st.sidebar.selectbox("Select patient", patient_names)
-    selected_patient = next(p for p in patients if p.name == selected_name)
+    # Sidebar controls: read the cheap widgets before touching the cohort.
+    # The patient selector needs the cohort's names, so reserve its slot
+    # at the top of the sidebar and fill it once the cohort is available.
+    patient_slot = st.sidebar.empty()
     month_index = st.sidebar.slider(
         "Month", min_value=0, max_value=11, value=0, format="%d",
         help="Scroll through the months of the year to see changes over time.",
     )
+    # The cohort lives in session state so reruns skip even the cache lookup
+    if "cohort" not in st.session_state:
+        st.session_state["cohort"] = create_patients(10)
+    cohort: Cohort = st.session_state["cohort"]
+    selected_idx = patient_slot.selectbox(
+        "Select patient", range(len(cohort)), format_func=lambda i: cohort.names[i],
+    )
+    selected_name = cohort.names[selected_idx]
     # Display high‑level patient information
-    st.subheader(f"Patient profile: {selected_patient.name}")
-    st.write(f"**Pump type:** {selected_patient.pump_type}")
+    st.subheader(f"Patient profile: {selected_name}")
+    st.write(f"**Pump type:** {cohort.pump_type(selected_idx)}")
     # Monthly summary
     month_name = _format_month(month_index)
     st.markdown(f"### {month_name}")
-    avg_bg, basal_units, bolus_units = selected_patient.metrics_for_month(month_index)
+    md = cohort.month_view(selected_idx, month_index)
+    avg_bg, basal_units, bolus_units = md.avg_bg, md.basal_units, md.bolus_units
     # Create charts in columns
     col1, col2, col3 = st.columns([2, 2, 1])
     with col1:
         st.markdown("**Blood Glucose Trend**")
-        md = selected_patient.months[month_index]
-        bg_df = pd.DataFrame({
-            "Day": list(range(1, len(md.bg_values) + 1)),
-            "Blood Glucose (mg/dL)": md.bg_values,
-        })
-        st.line_chart(bg_df.set_index("Day"))
+        st.line_chart(
+            {
+                "Day": np.arange(1, len(md.bg_values) + 1),
+                "Blood Glucose (mg/dL)": md.bg_values,
+            },
+            x="Day",
+        )
     with col2:
         st.markdown("**Insulin Delivery**")
-        insulin_df = pd.DataFrame({
-            "Type": ["Basal", "Bolus"],
-            "Units/day": [md.basal_units, md.bolus_units],
-        })
         # Represent basal and bolus as a bar chart
-        st.bar_chart(insulin_df.set_index("Type"))
+        st.bar_chart(
+            {"Type": ["Basal", "Bolus"], "Units/day": [md.basal_units, md.bolus_units]},
+            x="Type",
+        )
     with col3:
         st.markdown("**Monthly Metrics**")
         st.metric(label="Avg BG (mg/dL)", value=f"{avg_bg:.1f}")
@@ -309,9 +434,9 @@ def main() -> None:
         st.metric(label="Bolus units/day", value=f"{bolus_units:.1f}")
     # Narrative and recommendations
     st.markdown("### Monthly Narrative")
-    st.write(selected_patient.months[month_index].notes)
+    st.write(md.notes)
     st.markdown("### Recommendation")
-    rec = recommend_adjustment(selected_patient, month_index)
+    rec = recommend_adjustment(cohort, selected_idx, month_index)
     st.write(rec)
 
 